@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import os
+import re
+import unicodedata
+import uuid
+
+import numpy as np
+
+ACK_CACHE_DIR = os.getenv("ACK_CACHE_DIR", "ack_cache")
+MAX_ACK_CHARS = 24       # longer finals can't be a backchannel; skip normalizing them
+SYNTH_TIMEOUT_S = 15
+
+# Short source utterance (normalized) -> target phrase to play
+EN_TO_ES = {
+    "ok": "Vale.", "okay": "Vale.", "alright": "Vale.", "all right": "Vale.",
+    "yes": "Sí.", "yeah": "Sí.", "yep": "Sí.", "no": "No.",
+    "sure": "Claro.", "of course": "Claro.", "right": "Correcto.", "exactly": "Exacto.",
+    "thank you": "Gracias.", "thanks": "Gracias.", "thank you so much": "Muchas gracias.",
+    "got it": "Entendido.", "i see": "Ya veo.", "great": "Genial.", "perfect": "Perfecto.",
+    "hello": "Hola.", "hi": "Hola.", "bye": "Adiós.", "goodbye": "Adiós.",
+}
+ES_TO_EN = {
+    "ok": "Okay.", "okay": "Okay.", "vale": "Okay.", "de acuerdo": "Agreed.",
+    "si": "Yes.", "no": "No.", "claro": "Sure.", "claro que si": "Of course.", "por supuesto": "Of course.",
+    "exacto": "Exactly.", "correcto": "Right.", "gracias": "Thank you.", "muchas gracias": "Thank you so much.",
+    "entendido": "Got it.", "ya veo": "I see.", "genial": "Great.", "perfecto": "Perfect.",
+    "hola": "Hello.", "adios": "Goodbye.", "chao": "Bye.",
+}
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation, collapse spaces: 'Sí, claro.' -> 'si claro'."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", text)).strip()
+
+class AckBank:
+    """
+    Pre-synthesized audio for short acknowledgements ("okay", "sí", "thank you").
+
+    Each target phrase is synthesized once per voice with Cartesia and cached on disk as
+    int16 arrays, so a matching Deepgram final can be played straight away without
+    going through Groq or TTS.
+    """
+    def __init__(self, phrases, voice_id):
+        self.phrases = {normalize(k): v for k, v in phrases.items()}
+        self.voice_id = voice_id
+        self.audio = {}  # target phrase -> np.int16 PCM
+        self.ready = False
+
+    def cache_path(self, model_id, sample_rate):
+        targets = "\n".join(sorted(set(self.phrases.values())))
+        key = hashlib.sha1(f"{self.voice_id}|{model_id}|{sample_rate}|{targets}".encode()).hexdigest()[:16]
+        return os.path.join(ACK_CACHE_DIR, f"{self.voice_id}_{key}.npz")
+
+    def lookup(self, transcript):
+        """(target phrase, PCM bytes) for a short acknowledgement, or None."""
+        if not self.ready or len(transcript) > MAX_ACK_CHARS:
+            return None
+        target = self.phrases.get(normalize(transcript))
+        if target is None or target not in self.audio:
+            return None
+        return target, self.audio[target].tobytes()
+
+    def load(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            names = {hashlib.sha1(t.encode()).hexdigest()[:12]: t for t in set(self.phrases.values())}
+            self.audio = {names[n]: data[n] for n in data.files if n in names}
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, **{hashlib.sha1(t.encode()).hexdigest()[:12]: pcm for t, pcm in self.audio.items()})
+
+    async def prepare(self, cartesia_client, make_payload, model_id, sample_rate):
+        """Loads the bank from disk, or synthesizes every phrase over one websocket and caches it."""
+        path = self.cache_path(model_id, sample_rate)
+        if os.path.exists(path):
+            await asyncio.to_thread(self.load, path)
+        else:
+            await self.synthesize(cartesia_client, make_payload)
+            if not self.audio:
+                raise RuntimeError("Cartesia returned no audio")
+            await asyncio.to_thread(self.save, path)
+        self.ready = True
+        return path
+
+    async def synthesize(self, cartesia_client, make_payload):
+        contexts = {str(uuid.uuid4()): target for target in set(self.phrases.values())}
+        chunks = {context_id: [] for context_id in contexts}
+        async with cartesia_client.tts.websocket_connect() as ws:
+            for context_id, target in contexts.items():
+                await ws.send(make_payload(target, context_id, False))
+
+            async def collect():
+                pending = set(contexts)
+                async for chunk in ws:
+                    context_id = getattr(chunk, "context_id", None)
+                    audio = getattr(chunk, "audio", None)
+                    if audio and context_id in chunks:
+                        chunks[context_id].append(audio)
+                    if getattr(chunk, "done", False) or getattr(chunk, "type", None) == "done":
+                        pending.discard(context_id)
+                        if not pending:
+                            return
+
+            await asyncio.wait_for(collect(), timeout=SYNTH_TIMEOUT_S)
+        self.audio = {
+            contexts[context_id]: np.frombuffer(b"".join(parts), dtype=np.int16)
+            for context_id, parts in chunks.items() if parts
+        }
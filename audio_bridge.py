@@ -2,9 +2,11 @@ import asyncio
 import os
 import sys
 import time
+import collections
 import pyaudio
 import numpy as np
 from dotenv import load_dotenv
+from loop_monitor import LoopMonitor
 from google import genai
 from google.genai import types
 from google.genai.types import (
@@ -23,14 +25,25 @@ CHANNELS = 1
 RATE = 16000
 CHUNK = 1024
 TARGET_MODEL = "gemini-2.5-flash-native-audio-preview-12-2025" 
+PRE_ROLL_MS = 300
+PLAYBACK_FRAME_MS = 20
+PLAYBACK_PREBUFFER_MS = 80
+# Set to 1 to stream zero-filled silence with server-side VAD (old behaviour, for comparison)
+LEGACY_SILENCE = os.environ.get("GEMINI_LEGACY_SILENCE") == "1"
 
 class VAD:
     """
     Simple Voice Activity Detector based on RMS energy with hysteresis.
+
+    Energy is computed in a preallocated float32 buffer and compared against squared
+    thresholds, so no arrays are allocated per chunk.
     """
-    def __init__(self, start_threshold=500, stop_threshold=300, min_speech_duration_ms=100, min_silence_duration_ms=400):
+    def __init__(self, start_threshold=500, stop_threshold=300, min_speech_duration_ms=100, min_silence_duration_ms=400, max_samples=CHUNK):
         self.start_threshold = start_threshold
         self.stop_threshold = stop_threshold
+        self.start_energy = float(start_threshold) ** 2
+        self.stop_energy = float(stop_threshold) ** 2
+        self.buffer = np.zeros(max_samples, dtype=np.float32)
         self.min_speech_ms = min_speech_duration_ms
         self.min_silence_ms = min_silence_duration_ms
         
@@ -39,16 +52,23 @@ class VAD:
         self.consecutive_silence_ms = 0
         self.last_state = "silence"
 
-    def is_speech(self, audio_data, chunk_ms):
-         # Calculate RMS
+    def mean_energy(self, audio_data):
+        # View (no copy) over the int16 samples, cast into the preallocated buffer
         audio_np = np.frombuffer(audio_data, dtype=np.int16)
-        # Safe cast to avoid overflow
-        if len(audio_np) == 0: return False
-        rms = np.sqrt(np.mean(audio_np.astype(np.float64)**2))
+        n = len(audio_np)
+        if n == 0: return 0.0
+        if n > len(self.buffer):
+            self.buffer = np.zeros(n, dtype=np.float32)
+        window = self.buffer[:n]
+        np.copyto(window, audio_np, casting="unsafe")
+        return float(np.dot(window, window)) / n
+
+    def is_speech(self, audio_data, chunk_ms):
+        energy = self.mean_energy(audio_data)
         
         # State Machine
         if not self.speech_active:
-            if rms > self.start_threshold:
+            if energy > self.start_energy:
                 self.consecutive_speech_ms += chunk_ms
                 if self.consecutive_speech_ms >= self.min_speech_ms:
                     self.speech_active = True
@@ -57,17 +77,80 @@ class VAD:
             else:
                 self.consecutive_speech_ms = 0
         else:
-            if rms < self.stop_threshold:
+            if energy < self.stop_energy:
                 self.consecutive_silence_ms += chunk_ms
                 if self.consecutive_silence_ms >= self.min_silence_ms:
                     self.speech_active = False
                     self.consecutive_speech_ms = 0
-                    print(f"[Speech END] RMS: {rms}")
+                    print(f"[Speech END] RMS: {energy ** 0.5:.0f}")
             else:
                 self.consecutive_silence_ms = 0
                 
         return self.speech_active
 
+class PlaybackBuffer:
+    """
+    Jitter buffer between the Gemini receive loop and the sound card.
+
+    The receive loop only enqueues (never blocks); a separate task writes small
+    frames to the output stream in a worker thread, so a flush on interruption
+    drops everything not yet handed to the device.
+    """
+    def __init__(self, rate=RATE, frame_ms=PLAYBACK_FRAME_MS, prebuffer_ms=PLAYBACK_PREBUFFER_MS):
+        self.bytes_per_ms = rate * 2 // 1000
+        self.frame_bytes = self.bytes_per_ms * frame_ms
+        self.prebuffer_frames = max(1, prebuffer_ms // frame_ms)
+        self.queue = asyncio.Queue()
+        self.queued_bytes = 0
+        self.max_queued_bytes = 0
+        self.dropped_bytes = 0
+        self.generation = 0
+
+    def feed(self, data):
+        for i in range(0, len(data), self.frame_bytes):
+            frame = data[i:i + self.frame_bytes]
+            self.queue.put_nowait(frame)
+            self.queued_bytes += len(frame)
+        self.max_queued_bytes = max(self.max_queued_bytes, self.queued_bytes)
+
+    def flush(self):
+        # Bumping the generation also discards the frame the player is holding
+        self.generation += 1
+        dropped = 0
+        while not self.queue.empty():
+            dropped += len(self.queue.get_nowait())
+        self.queued_bytes -= dropped
+        self.dropped_bytes += dropped
+        return dropped
+
+    def depth_ms(self):
+        return self.queued_bytes // self.bytes_per_ms
+
+    def next_frame(self):
+        if self.queue.empty():
+            return None
+        frame = self.queue.get_nowait()
+        self.queued_bytes -= len(frame)
+        return frame
+
+    async def run(self, output_stream, stop_event):
+        while not stop_event.is_set():
+            frame = await self.queue.get()
+            self.queued_bytes -= len(frame)
+            generation = self.generation
+            # Starting from idle: hold briefly (bounded) so network jitter doesn't underrun
+            waited_ms = 0
+            while self.queue.qsize() < self.prebuffer_frames - 1 and waited_ms < PLAYBACK_PREBUFFER_MS:
+                await asyncio.sleep(PLAYBACK_FRAME_MS / 1000)
+                waited_ms += PLAYBACK_FRAME_MS
+            while frame is not None and generation == self.generation:
+                try:
+                    await asyncio.to_thread(output_stream.write, frame)
+                except Exception as e:
+                    print(f"Playback Error: {e}")
+                # Re-check after the write: a flush during it must not take the next (new) audio's frame
+                frame = self.next_frame() if generation == self.generation else None
+
 class AudioBridge:
     def __init__(self, api_key):
         self.api_key = api_key
@@ -77,6 +160,12 @@ class AudioBridge:
         self.client = None
         self.stop_event = asyncio.Event()
         self.vad = VAD()
+        self.playback = PlaybackBuffer()
+        self.pre_roll = collections.deque(maxlen=max(1, PRE_ROLL_MS * RATE // (CHUNK * 1000)))
+        # Send-side metrics
+        self.bytes_sent = 0
+        self.bytes_skipped = 0
+        self.activity_end_time = None
 
     def get_device_index(self, name_fragment, is_input=True):
         count = self.p.get_device_count()
@@ -94,6 +183,7 @@ class AudioBridge:
         return found_index
 
     async def connect_gemini(self):
+        LoopMonitor("gemini").start()
         self.client = genai.Client(api_key=self.api_key, http_options={"api_version": "v1alpha"})
         
         input_device_index = self.get_device_index("BlackHole 2ch", is_input=True)
@@ -153,8 +243,15 @@ class AudioBridge:
         )
         
         # Modified config
+        # Local VAD drives turns with explicit activity start/end, so server VAD is off
+        realtime_input_config = None
+        if not LEGACY_SILENCE:
+            realtime_input_config = types.RealtimeInputConfig(
+                automatic_activity_detection=types.AutomaticActivityDetection(disabled=True)
+            )
         config = LiveConnectConfig(
             response_modalities=["AUDIO"],
+            realtime_input_config=realtime_input_config,
             speech_config=SpeechConfig(
                 voice_config=VoiceConfig(
                     prebuilt_voice_config=PrebuiltVoiceConfig(
@@ -174,14 +271,20 @@ class AudioBridge:
             # Start tasks
             send_task = asyncio.create_task(self.send_audio_loop(session))
             receive_task = asyncio.create_task(self.receive_audio_loop(session))
+            playback_task = asyncio.create_task(self.playback.run(self.output_stream, self.stop_event))
             
-            await asyncio.gather(send_task, receive_task)
+            try:
+                await asyncio.gather(send_task, receive_task)
+            finally:
+                playback_task.cancel()
 
     async def send_audio_loop(self, session):
         try:
             print("Starting audio send loop...")
             loop = asyncio.get_running_loop()
             ms_per_chunk = int((CHUNK / RATE) * 1000)
+            silence = b'\x00' * (CHUNK * 2)
+            active = False
             
             while not self.stop_event.is_set():
                 try:
@@ -192,16 +295,33 @@ class AudioBridge:
                     )
                     
                     # Local VAD Processing
-                    if self.vad.is_speech(data, ms_per_chunk):
-                         # Send actual audio
-                         await session.send_realtime_input(media={"data": data, "mime_type": "audio/pcm"})
-                         print(".", end="", flush=True) 
+                    speech = self.vad.is_speech(data, ms_per_chunk)
+                    if LEGACY_SILENCE:
+                        # Stream zeros while silent so server VAD sees the turn end
+                        await self.send_audio(session, data if speech else silence[:len(data)])
+                        if active and not speech:
+                            self.activity_end_time = time.perf_counter()
+                        active = speech
+                        continue
+
+                    if speech and not active:
+                        active = True
+                        await session.send_realtime_input(activity_start=types.ActivityStart())
+                        # Pre-roll keeps the onset that VAD needed to confirm speech
+                        while self.pre_roll:
+                            chunk = self.pre_roll.popleft()
+                            self.bytes_skipped -= len(chunk)
+                            await self.send_audio(session, chunk)
+                    if active:
+                        await self.send_audio(session, data)
+                        print(".", end="", flush=True) 
+                        if not speech:
+                            active = False
+                            await session.send_realtime_input(activity_end=types.ActivityEnd())
+                            self.activity_end_time = time.perf_counter()
                     else:
-                         # Send silence (zeros) to "gate" the noise
-                         # Crucial for Gemini to realize the turn has ended
-                         silence = b'\x00' * len(data)
-                         await session.send_realtime_input(media={"data": silence, "mime_type": "audio/pcm"})
-                         # print("s", end="", flush=True) # Optional: indicate silence
+                        self.pre_roll.append(data)
+                        self.bytes_skipped += len(data)
                     
                     # No sleep needed here as run_in_executor yields
                 except IOError as e:
@@ -212,6 +332,20 @@ class AudioBridge:
             print(f"Error in send loop: {e}")
             self.stop_event.set()
 
+    async def send_audio(self, session, data):
+        await session.send_realtime_input(media={"data": data, "mime_type": "audio/pcm"})
+        self.bytes_sent += len(data)
+
+    def report_turn(self):
+        latency = ""
+        if self.activity_end_time is not None:
+            latency = f", turn-complete latency {(time.perf_counter() - self.activity_end_time) * 1000:.0f}ms"
+            self.activity_end_time = None
+        print(
+            f"[Stats] sent {self.bytes_sent / 1024:.0f} KiB, skipped {self.bytes_skipped / 1024:.0f} KiB{latency}"
+            f" | playback queue {self.playback.depth_ms()}ms (max {self.playback.max_queued_bytes // self.playback.bytes_per_ms}ms)"
+        )
+
     async def receive_audio_loop(self, session):
         # ... (same as before, just ensuring we print debugs)
         print("Starting receive loop...")
@@ -222,8 +356,13 @@ class AudioBridge:
                 
                 server_content = response.server_content
                 if server_content:
+                    if server_content.interrupted:
+                        dropped = self.playback.flush()
+                        print(f"\n[Interrupted] Dropped {dropped // self.playback.bytes_per_ms}ms of unplayed audio")
+
                     if server_content.turn_complete:
                         print("\n[Turn Complete]")
+                        self.report_turn()
                     
                     model_turn = server_content.model_turn
                     if model_turn:
@@ -233,7 +372,7 @@ class AudioBridge:
                                     print(f"Gemini (Text): {part.text}")
                                 if part.inline_data:
                                     # print(f"[Audio Chunk Received: {len(part.inline_data.data)} bytes]")
-                                    self.output_stream.write(part.inline_data.data)
+                                    self.playback.feed(part.inline_data.data)
                         else:
                             print("[Model Turn with no parts]")
                 
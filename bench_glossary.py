@@ -0,0 +1,58 @@
+import random
+import string
+import sys
+import time
+
+from glossary import Glossary, PlaceholderRestorer
+
+# Microbenchmark: glossary compile time and per-transcript pin/restore cost.
+# Usage: python bench_glossary.py [num_terms ...]
+
+TRANSCRIPT = (
+    "So the plan is to migrate the billing service to Kubernetes next sprint, "
+    "and then hook the Acme Cloud Gateway into the new observability stack before the demo."
+)
+
+def random_term(rng):
+    words = rng.randint(1, 3)
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(words)
+    )
+
+def run(num_terms, iterations=2000):
+    rng = random.Random(num_terms)
+    entries = {random_term(rng): f"term{i}" for i in range(num_terms)}
+    entries["Kubernetes"] = "Kubernetes"
+    entries["Acme Cloud Gateway"] = "Acme Cloud Gateway"
+    entries["billing service"] = "servicio de facturación"
+
+    start = time.perf_counter()
+    glossary = Glossary(entries)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    pinned, mapping = glossary.pin(TRANSCRIPT)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        glossary.pin(TRANSCRIPT)
+    pin_us = (time.perf_counter() - start) / iterations * 1e6
+
+    # Simulate the LLM echoing placeholders back in small streamed deltas
+    deltas = [pinned[i:i + 3] for i in range(0, len(pinned), 3)]
+    start = time.perf_counter()
+    for _ in range(iterations):
+        restorer = PlaceholderRestorer(mapping)
+        for delta in deltas:
+            restorer.feed(delta)
+        restorer.flush()
+    restore_us = (time.perf_counter() - start) / iterations * 1e6
+
+    print(
+        f"{len(glossary):>7} terms | build {build_ms:8.1f}ms | "
+        f"pin {pin_us:7.1f}us/transcript | restore {restore_us:7.1f}us/stream | {len(mapping)} pinned"
+    )
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 10000, 50000]
+    print(f"Transcript: {len(TRANSCRIPT)} chars")
+    for size in sizes:
+        run(size)
@@ -0,0 +1,266 @@
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+
+from loop_monitor import LoopMonitor
+
+# Control socket (localhost only). One JSON object per line in each direction.
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = int(os.getenv("BRIDGE_CONTROL_PORT", "47800"))
+
+# Hosts whose DNS we resolve during warm-up (Deepgram/Cartesia sockets are opened per start)
+WARM_HOSTS = ["api.deepgram.com", "api.cartesia.ai"]
+
+def task_ok(task):
+    return task is not None and task.done() and not task.cancelled() and task.exception() is None
+
+class BridgeDaemon:
+    """
+    Long-lived host for the translation pipelines, driven by the launcher over a
+    local control socket.
+
+    The heavy imports (groq, cartesia, numpy, pyaudio), PortAudio init and provider
+    connections are paid once in the background right after the daemon starts, so
+    pressing "Start" only has to open the audio streams and websockets.
+    """
+    def __init__(self):
+        self.bridge = None        # modular_bridge, imported lazily during warm-up
+        self.pyaudio = None
+        self.groq_client = None
+        self.cartesia_client = None
+        self.pipelines = {}       # name -> (TranslationPipeline, task)
+        self.last_stats = {}      # name -> timings of the most recent run
+        self.warm_task = None
+        self.audio_task = None
+        self.shutdown_event = None
+        self.audio_lock = None    # held while the PyAudio instance is swapped
+        self.monitor = None
+
+    def log(self, message):
+        print(f"[{time.strftime('%H:%M:%S')}][DAEMON] {message}", flush=True)
+
+    async def warm_up(self):
+        try:
+            t0 = time.perf_counter()
+            await self.ensure_audio()
+            t_audio = time.perf_counter()
+            await self.warm_clients()
+            await asyncio.to_thread(self.compile_glossaries)
+            self.log(f"Warm in {time.perf_counter() - t0:.2f}s (connections {time.perf_counter() - t_audio:.2f}s)")
+        except Exception as e:
+            self.log(f"Warm-up Error: {e}")
+            raise
+
+    async def load_audio(self):
+        t0 = time.perf_counter()
+        self.bridge = await asyncio.to_thread(importlib.import_module, "modular_bridge")
+        t_import = time.perf_counter()
+        self.pyaudio = await asyncio.to_thread(self.bridge.pyaudio.PyAudio)
+        self.log(f"Audio ready (imports {t_import - t0:.2f}s, PortAudio {time.perf_counter() - t_import:.2f}s)")
+
+    async def ensure_audio(self):
+        """Imports and PortAudio only; device listing doesn't need provider clients."""
+        if self.audio_task is None or (self.audio_task.done() and not task_ok(self.audio_task)):
+            self.audio_task = asyncio.create_task(self.load_audio())
+        await self.audio_task
+
+    async def refresh_audio(self):
+        """PortAudio only lists devices at init; re-creates it to pick up new ones while no pipeline uses it."""
+        async with self.audio_lock:
+            if self.pipelines or self.pyaudio is None:
+                return
+            # Terminate first: PortAudio only rescans once its init count drops to zero
+            await asyncio.to_thread(self.pyaudio.terminate)
+            self.pyaudio = None
+            self.pyaudio = await asyncio.to_thread(self.bridge.pyaudio.PyAudio)
+
+    async def ensure_warm(self, retry=False):
+        # A failed warm-up (e.g. no keys yet) is retried by start/reload instead of sticking
+        if retry and self.warm_task.done() and not task_ok(self.warm_task):
+            self.warm_task = asyncio.create_task(self.warm_up())
+        await self.warm_task
+
+    async def warm_clients(self):
+        bridge = self.bridge
+        self.groq_client = bridge.AsyncGroq(api_key=bridge.GROQ_API_KEY)
+        self.cartesia_client = bridge.AsyncCartesia(api_key=bridge.CARTESIA_API_KEY)
+        loop = asyncio.get_running_loop()
+        try:
+            # Leaves a TLS connection in the client's keep-alive pool
+            await self.groq_client.models.list()
+        except Exception as e:
+            self.log(f"Groq warm-up failed: {e}")
+        for host in WARM_HOSTS:
+            try:
+                await loop.getaddrinfo(host, 443)
+            except Exception as e:
+                self.log(f"DNS warm-up failed for {host}: {e}")
+
+    def compile_glossaries(self):
+        # Large glossaries take seconds to compile; done off the loop so the pipeline
+        # constructor only hits the cache
+        for config in self.bridge.pipeline_configs().values():
+            try:
+                self.bridge.load_glossary(config["glossary_path"])
+            except Exception as e:
+                self.log(f"Glossary Error ({config['glossary_path']}): {e}")
+
+    def resolve_names(self, name):
+        names = list(self.bridge.pipeline_configs()) if name in (None, "all") else [name]
+        for n in names:
+            if n not in self.bridge.pipeline_configs():
+                raise ValueError(f"Unknown pipeline '{n}'")
+        return names
+
+    async def start_pipeline(self, name):
+        if name in self.pipelines:
+            return
+        await asyncio.to_thread(self.compile_glossaries)  # reload clears the cache
+        async with self.audio_lock:
+            pipeline = self.bridge.TranslationPipeline(
+                **self.bridge.pipeline_configs()[name],
+                pyaudio_instance=self.pyaudio,
+                groq_client=self.groq_client,
+                cartesia_client=self.cartesia_client,
+            )
+        task = asyncio.create_task(pipeline.start())
+        task.add_done_callback(lambda _, n=name, p=pipeline: self.on_pipeline_done(n, p))
+        self.pipelines[name] = (pipeline, task)
+
+    def on_pipeline_done(self, name, pipeline):
+        entry = self.pipelines.get(name)
+        if entry and entry[0] is pipeline:
+            del self.pipelines[name]
+        self.last_stats[name] = self.pipeline_stats(pipeline)
+
+    async def stop_pipeline(self, name):
+        entry = self.pipelines.get(name)
+        if not entry:
+            return
+        pipeline, task = entry
+        # Let the capture loop exit on its own (one CHUNK read) before cancelling
+        pipeline.is_running = False
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout=2)
+        except asyncio.TimeoutError:
+            task.cancel()
+            try: await task
+            except: pass
+
+    def pipeline_stats(self, pipeline):
+        def since_start(t):
+            return round(t - pipeline.start_time, 3) if t else None
+        return {
+            "running": pipeline.is_running,
+            "ready_s": since_start(pipeline.ready_time),
+            "first_translation_s": since_start(pipeline.first_translation_time),
+            "health": {h.name: h.snapshot() for h in (pipeline.groq_health, pipeline.cartesia_health)},
+            "metrics": dict(pipeline.metrics),
+        }
+
+    def status(self):
+        pipelines = dict(self.last_stats)
+        for name, (pipeline, _) in self.pipelines.items():
+            pipelines[name] = self.pipeline_stats(pipeline)
+        return {"warm": task_ok(self.warm_task), "loop": self.monitor.stats(), "pipelines": pipelines}
+
+    async def reload(self):
+        await self.ensure_audio()
+        self.bridge.load_config(override=True)
+        if not task_ok(self.warm_task):
+            await self.refresh_audio()
+            await self.ensure_warm(retry=True)  # warm_up builds the clients with the new keys
+            self.log("Config reloaded (warm-up retried)")
+            return
+        running = list(self.pipelines)
+        for name in running:
+            await self.stop_pipeline(name)
+        await self.refresh_audio()
+        await self.warm_clients()
+        for name in running:
+            await self.start_pipeline(name)
+        self.log(f"Config reloaded (restarted: {', '.join(running) or 'none'})")
+
+    def devices(self):
+        return [
+            {"index": i, "name": info["name"], "in": info["maxInputChannels"], "out": info["maxOutputChannels"]}
+            for i, info in ((i, self.pyaudio.get_device_info_by_index(i)) for i in range(self.pyaudio.get_device_count()))
+        ]
+
+    async def handle_command(self, request):
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return {"ok": True}
+        if cmd == "status":
+            return {"ok": True, **self.status()}
+        if cmd == "profile":
+            # Toggle; stopping returns the collapsed-stack file for flamegraph tools
+            return {"ok": True, "profile": self.monitor.toggle_profiler()}
+        if cmd == "shutdown":
+            self.shutdown_event.set()
+            return {"ok": True}
+
+        if cmd == "devices":
+            loaded = task_ok(self.audio_task)
+            await self.ensure_audio()
+            if loaded:
+                await self.refresh_audio()
+            return {"ok": True, "devices": self.devices()}
+        if cmd == "reload":
+            await self.reload()
+            return {"ok": True, **self.status()}
+
+        # Everything else needs the bridge loaded
+        await self.ensure_warm(retry=True)
+        if cmd in ("start", "stop", "restart"):
+            names = self.resolve_names(request.get("pipeline"))
+            for name in names:
+                if cmd in ("stop", "restart"):
+                    await self.stop_pipeline(name)
+                if cmd in ("start", "restart"):
+                    await self.start_pipeline(name)
+            self.log(f"{cmd}: {', '.join(names)}")
+            return {"ok": True, **self.status()}
+        return {"ok": False, "error": f"Unknown command '{cmd}'"}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle_command(json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self):
+        self.shutdown_event = asyncio.Event()
+        self.audio_lock = asyncio.Lock()
+        self.monitor = LoopMonitor("daemon", log=self.log).start()
+        server = await asyncio.start_server(self.handle_client, CONTROL_HOST, CONTROL_PORT)
+        self.log(f"Control socket on {CONTROL_HOST}:{CONTROL_PORT}")
+        self.warm_task = asyncio.create_task(self.warm_up())
+        async with server:
+            await self.shutdown_event.wait()
+        self.log("Shutting down...")
+        self.monitor.stop()
+        for name in list(self.pipelines):
+            await self.stop_pipeline(name)
+        if self.pyaudio:
+            self.pyaudio.terminate()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(BridgeDaemon().run())
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Fatal Error: {e}")
+        sys.exit(1)
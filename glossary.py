@@ -0,0 +1,180 @@
+import json
+import re
+
+PLACEHOLDER_RE = re.compile(r"\[T(\d+)\]")
+# Tail of a stream that could still turn into a placeholder ("[", "[T", "[T1")
+PARTIAL_PLACEHOLDER_RE = re.compile(r"\[(T\d*)?$")
+
+PROMPT_SUFFIX = " Copy tokens like [T0] exactly as they appear, do not translate them."
+
+def fold_case(text):
+    """Lowercases without changing the length, so match offsets still index the original text."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # Characters like "İ" lower to two code points; keep those as they are
+    return "".join(low if len(low) == 1 else c for c, low in ((c, c.lower()) for c in text))
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over lowercase terms.
+
+    Built once per glossary; each search is linear in the text length plus the number
+    of matches, independent of how many terms the glossary holds.
+    """
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.term_at = [-1]   # term index ending exactly at this node
+        self.dict_link = [0]  # nearest suffix node that ends a term (0 = none)
+        self.terms = terms
+        for index, term in enumerate(terms):
+            self._insert(term, index)
+        self._build_links()
+
+    def _insert(self, term, index):
+        node = 0
+        for char in term:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.term_at.append(-1)
+                self.dict_link.append(0)
+                self.goto[node][char] = nxt
+            node = nxt
+        self.term_at[node] = index
+
+    def _build_links(self):
+        queue = list(self.goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                target = self.goto[state].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                fail_node = self.fail[child]
+                self.dict_link[child] = fail_node if self.term_at[fail_node] >= 0 else self.dict_link[fail_node]
+
+    def iter_matches(self, text):
+        """Yields (start, end, term_index) for every occurrence in text."""
+        goto, fail, term_at, dict_link, terms = self.goto, self.fail, self.term_at, self.dict_link, self.terms
+        node = 0
+        for pos, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            hit = node if term_at[node] >= 0 else dict_link[node]
+            while hit:
+                index = term_at[hit]
+                yield pos + 1 - len(terms[index]), pos + 1, index
+                hit = dict_link[hit]
+
+class Glossary:
+    """
+    Per-pipeline glossary: source term -> pinned target term.
+
+    Matched terms in a transcript are swapped for [Tn] placeholders before the Groq
+    call, and the placeholders are swapped back for the target terms as output streams in.
+    """
+    def __init__(self, entries):
+        self.sources = []
+        self.targets = []
+        for source, target in entries.items():
+            source = source.strip()
+            if source:
+                self.sources.append(fold_case(source))
+                self.targets.append(target.strip() or source)
+        self.automaton = AhoCorasick(self.sources)
+
+    @classmethod
+    def load(cls, path):
+        """Loads a JSON object of {"source term": "target term"}."""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.sources)
+
+    def find(self, text):
+        """Leftmost-longest, whole-word, non-overlapping matches as (start, end, index)."""
+        lowered = fold_case(text)
+        candidates = [
+            m for m in self.automaton.iter_matches(lowered)
+            if (m[0] == 0 or not lowered[m[0] - 1].isalnum())
+            and (m[1] == len(lowered) or not lowered[m[1]].isalnum())
+        ]
+        candidates.sort(key=lambda m: (m[0], -m[1]))
+        matches = []
+        last_end = 0
+        for start, end, index in candidates:
+            if start >= last_end:
+                matches.append((start, end, index))
+                last_end = end
+        return matches
+
+    def pin(self, text):
+        """Returns (text with placeholders, {placeholder number: target term})."""
+        matches = self.find(text)
+        if not matches:
+            return text, {}
+        parts = []
+        mapping = {}
+        last = 0
+        for slot, (start, end, index) in enumerate(matches):
+            parts.append(text[last:start])
+            parts.append(f"[T{slot}]")
+            mapping[slot] = self.targets[index]
+            last = end
+        parts.append(text[last:])
+        return "".join(parts), mapping
+
+class PlaceholderRestorer:
+    """
+    Streaming inverse of Glossary.pin: feed LLM deltas, get text with terms restored.
+
+    Only a possible partial placeholder at the end of the stream is held back, so
+    tokens keep flowing to TTS as soon as they arrive.
+    """
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.pending = ""
+
+    def _restore(self, text):
+        return PLACEHOLDER_RE.sub(lambda m: self.mapping.get(int(m.group(1)), m.group(0)), text)
+
+    def feed(self, chunk):
+        if not self.mapping:
+            return chunk
+        text = self.pending + chunk
+        partial = PARTIAL_PLACEHOLDER_RE.search(text)
+        if partial:
+            self.pending = text[partial.start():]
+            text = text[:partial.start()]
+        else:
+            self.pending = ""
+        return self._restore(text)
+
+    def flush(self):
+        text, self.pending = self.pending, ""
+        return self._restore(text)
+
+_cache = {}
+
+def load_glossary(path):
+    """Loads and compiles a glossary once per path; pipelines sharing a file share it."""
+    if not path:
+        return None
+    if path not in _cache:
+        _cache[path] = Glossary.load(path)
+    return _cache[path]
+
+def clear_glossary_cache():
+    """Forgets compiled glossaries so the next load re-reads them (config hot reload)."""
+    _cache.clear()
@@ -1,8 +1,22 @@
 import os
 import sys
+import json
+import socket
 import subprocess
 import time
 
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = int(os.getenv("BRIDGE_CONTROL_PORT", "47800"))
+DAEMON_LOG = "bridge_daemon.log"
+
+# Required keys
+KEYS = [
+    "DEEPGRAM_API_KEY",
+    "GROQ_API_KEY",
+    "CARTESIA_API_KEY",
+    "VOICE_ID_OUTGOING"
+]
+
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
@@ -15,17 +29,7 @@ def print_header():
     """
     print(item)
 
-def check_env():
-    env_path = ".env"
-    
-    # Required keys
-    keys = [
-        "DEEPGRAM_API_KEY",
-        "GROQ_API_KEY",
-        "CARTESIA_API_KEY",
-        "VOICE_ID_OUTGOING"
-    ]
-    
+def read_env(env_path=".env"):
     current_config = {}
     
     if os.path.exists(env_path):
@@ -34,17 +38,31 @@ def check_env():
                 if "=" in line:
                     k, v = line.strip().split("=", 1)
                     current_config[k] = v
+    return current_config
+
+def env_complete():
+    current_config = read_env()
+    return all(current_config.get(k) for k in KEYS)
+
+def check_env(update=False):
+    env_path = ".env"
+    current_config = read_env(env_path)
     
-    missing_keys = [k for k in keys if k not in current_config or not current_config[k]]
+    missing_keys = [k for k in KEYS if k not in current_config or not current_config[k]]
     
-    if missing_keys:
-        print("\n[!] Missing Configuration. Please enter your API Keys:")
-        print("    (You can copy-paste them here, they will be saved to .env)\n")
+    if missing_keys or update:
+        if update:
+            print("\n[*] Update Configuration. Press Enter to keep the current value.\n")
+        else:
+            print("\n[!] Missing Configuration. Please enter your API Keys:")
+            print("    (You can copy-paste them here, they will be saved to .env)\n")
         
         new_config = current_config.copy()
-        for key in keys:
-            if key not in new_config or not new_config[key]:
-                value = input(f" > Enter {key}: ").strip()
+        for key in KEYS:
+            if update or key not in new_config or not new_config[key]:
+                current = new_config.get(key, "")
+                hint = f" [...{current[-4:]}]" if current else ""
+                value = input(f" > Enter {key}{hint}: ").strip()
                 if value:
                     new_config[key] = value
         
@@ -54,16 +72,92 @@ def check_env():
                 f.write(f"{k}={v}\n")
         print("\n[+] Configuration Saved!")
         time.sleep(1)
+        return True
+    return False
+
+def daemon_request(cmd, timeout=30, **kwargs):
+    """Sends one command to the bridge daemon; returns the response dict or None if it's not running."""
+    try:
+        with socket.create_connection((DAEMON_HOST, DAEMON_PORT), timeout=timeout) as sock:
+            sock.sendall((json.dumps({"cmd": cmd, **kwargs}) + "\n").encode())
+            with sock.makefile("r") as f:
+                return json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+def ensure_daemon():
+    """Starts the bridge daemon in the background (it warms up while the menu is shown)."""
+    if daemon_request("ping", timeout=1):
+        return True
+    with open(DAEMON_LOG, "a") as log:
+        subprocess.Popen(
+            [sys.executable, "-u", "bridge_daemon.py"],
+            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    for _ in range(50):
+        time.sleep(0.1)
+        if daemon_request("ping", timeout=1):
+            return True
+    print(f"[!] Bridge daemon did not start. See {DAEMON_LOG}")
+    return False
+
+def tail_log(offset):
+    with open(DAEMON_LOG, "r") as f:
+        f.seek(offset)
+        while True:
+            line = f.readline()
+            if line:
+                print(line, end="")
+            else:
+                time.sleep(0.1)
 
 def run_translator():
-    # Install deps first just in case
-    # subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+    if not ensure_daemon():
+        return
     
     print("\n[+] Starting Bridge... (Press Ctrl+C to Stop)\n")
+    offset = os.path.getsize(DAEMON_LOG)
+    t0 = time.perf_counter()
+    response = daemon_request("start", pipeline="all", timeout=120)
+    if not response or not response.get("ok"):
+        print(f"[!] Start failed: {response and response.get('error')}")
+        return
+    print(f"[+] Start accepted in {time.perf_counter() - t0:.2f}s (pipelines report ready/first-translation times below)\n")
     try:
-        subprocess.run([sys.executable, "modular_bridge.py"])
+        tail_log(offset)
     except KeyboardInterrupt:
         pass
+    daemon_request("stop", pipeline="all")
+    status = daemon_request("status") or {}
+    for name, stats in status.get("pipelines", {}).items():
+        print(f"    {name}: ready {stats['ready_s']}s, first translation {stats['first_translation_s']}s")
+
+def pipeline_controls():
+    if not ensure_daemon():
+        return
+    while True:
+        status = daemon_request("status") or {}
+        print(f"\nDaemon warm: {status.get('warm')} | event loop: {status.get('loop')}")
+        for name, stats in status.get("pipelines", {}).items():
+            print(f"  {name}: {'running' if stats['running'] else 'stopped'}")
+        choice = input("\nCommand (start|stop|restart) (incoming|outgoing|all), 'profile' to toggle the profiler, Enter to go back: ").split()
+        if choice == ["profile"]:
+            response = daemon_request("profile") or {}
+            print(f"[+] Profiler stopped, writing {response['profile']}" if response.get("profile") else "[+] Profiler started")
+            continue
+        if len(choice) != 2:
+            return
+        response = daemon_request(choice[0], pipeline=choice[1], timeout=120)
+        if not response or not response.get("ok"):
+            print(f"[!] {response and response.get('error')}")
+
+def reload_daemon(saved):
+    """Hot-reloads keys in an already running daemon after .env was saved, instead of restarting it."""
+    if saved and daemon_request("ping", timeout=1):
+        response = daemon_request("reload", timeout=120)
+        print("[+] Bridge reloaded." if response and response.get("ok") else f"[!] Reload failed: {response}")
+        time.sleep(1)
 
 def main_menu():
     while True:
@@ -73,36 +167,37 @@ def main_menu():
         print("1. Start Translation Bridge")
         print("2. Update API Keys")
         print("3. Check Audio Devices")
-        print("4. Exit")
+        print("4. Pipeline Controls (start/stop/restart)")
+        print("5. Exit")
         
-        choice = input("\nSelect option (1-4): ")
+        choice = input("\nSelect option (1-5): ")
         
         if choice == "1":
-            check_env()
+            reload_daemon(check_env())
             run_translator()
             input("\nPress Enter to return to menu...")
         elif choice == "2":
-            if os.path.exists(".env"):
-                os.remove(".env")
-            check_env()
+            reload_daemon(check_env(update=True))
         elif choice == "3":
-             # We can run a small python snippet to list devices
-             cmd = """
-import pyaudio
-p = pyaudio.PyAudio()
-print('\\nAudio Devices found:')
-for i in range(p.get_device_count()):
-    info = p.get_device_info_by_index(i)
-    print(f'  {i}: {info["name"]}')
-"""
-             subprocess.run([sys.executable, "-c", cmd])
-             print("\nMake sure you see 'BlackHole 2ch' and 'BlackHole 16ch'.")
-             input("\nPress Enter to return to menu...")
+            response = daemon_request("devices", timeout=60) if ensure_daemon() else None
+            print('\nAudio Devices found:')
+            for device in (response or {}).get("devices", []):
+                print(f'  {device["index"]}: {device["name"]}')
+            print("\nMake sure you see 'BlackHole 2ch' and 'BlackHole 16ch'.")
+            input("\nPress Enter to return to menu...")
         elif choice == "4":
+            reload_daemon(check_env())
+            pipeline_controls()
+        elif choice == "5":
+            daemon_request("shutdown", timeout=5)
             sys.exit()
 
 if __name__ == "__main__":
+    # Warm the bridge up in the background while the menu is shown
+    if env_complete():
+        ensure_daemon()
     try:
         main_menu()
     except KeyboardInterrupt:
+        daemon_request("shutdown", timeout=5)
         print("\nGoodbye!")
@@ -0,0 +1,154 @@
+import asyncio
+import collections
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+
+LAG_THRESHOLD_MS = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+def fold_stack(frame):
+    """Collapsed-stack line (root first, ';'-separated) as used by flamegraph.pl / speedscope."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+def callback_frames(frame):
+    """The running callback's frames, without the asyncio machinery that called it."""
+    frames = traceback.extract_stack(frame)
+    asyncio_dir = os.path.dirname(asyncio.__file__)
+    for i in range(len(frames) - 1, -1, -1):
+        if frames[i].filename.startswith(asyncio_dir) and frames[i].name == "_run":
+            return frames[i + 1:] or frames[-6:]
+    return frames[-6:]
+
+class LoopMonitor:
+    """
+    Measures event-loop scheduling lag and reports what blocked it.
+
+    A loop task ticks every interval and records how late it woke up. A watchdog
+    thread checks the tick heartbeat; when the loop hasn't ticked for threshold_ms it
+    grabs the loop thread's current stack, i.e. the callback that is blocking. Both
+    sides only wake every interval, so it is cheap enough to leave on.
+    """
+    def __init__(self, name="loop", threshold_ms=LAG_THRESHOLD_MS, interval_ms=None, log=print):
+        self.name = name
+        self.threshold_s = threshold_ms / 1000
+        self.interval_s = (interval_ms or threshold_ms / 2) / 1000
+        self.log = log
+        self.lags_ms = collections.deque(maxlen=1000)
+        self.max_lag_ms = 0.0
+        self.stalls = 0
+        self.heartbeat = time.perf_counter()
+        self.loop_thread_id = None
+        self.stall_stack = None
+        self.stop_event = threading.Event()
+        self.task = None
+        self.watchdog = None
+        self.profiler = None
+
+    def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self.task = asyncio.get_running_loop().create_task(self.tick_loop())
+        self.watchdog = threading.Thread(target=self.watch, name=f"{self.name}-watchdog", daemon=True)
+        self.watchdog.start()
+        self.install_signal_handler()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.task:
+            self.task.cancel()
+        if self.profiler:
+            self.toggle_profiler()
+
+    async def tick_loop(self):
+        while True:
+            expected = time.perf_counter() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            now = time.perf_counter()
+            self.heartbeat = now
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self.lags_ms.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms >= self.threshold_s * 1000:
+                self.stalls += 1
+                where = f"\n{self.stall_stack}" if self.stall_stack else ""
+                self.log(f"[LOOP] {self.name}: lag {lag_ms:.0f}ms{where}")
+            self.stall_stack = None
+
+    def watch(self):
+        while not self.stop_event.wait(self.interval_s):
+            if self.stall_stack is None and time.perf_counter() - self.heartbeat > self.threshold_s + self.interval_s:
+                frame = sys._current_frames().get(self.loop_thread_id)
+                if frame is not None:
+                    self.stall_stack = "".join(traceback.format_list(callback_frames(frame))).rstrip()
+
+    def stats(self):
+        lags = sorted(self.lags_ms)
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+        return {"p99_lag_ms": round(p99, 1), "max_lag_ms": round(self.max_lag_ms, 1), "stalls": self.stalls,
+                "profiling": self.profiler is not None}
+
+    def install_signal_handler(self):
+        # kill -USR2 <pid> toggles the profiler (not available on Windows)
+        if hasattr(signal, "SIGUSR2"):
+            try:
+                asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, self.toggle_profiler)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    def toggle_profiler(self, path=None):
+        """Starts the profiler, or stops it and returns the path its thread writes to."""
+        if self.profiler is None:
+            self.profiler = SamplingProfiler(self.loop_thread_id, log=self.log).start()
+            self.log(f"[LOOP] Profiler started ({PROFILE_INTERVAL_MS}ms interval)")
+            return None
+        profiler, self.profiler = self.profiler, None
+        return profiler.stop(path)
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack from a background thread and writes collapsed stacks
+    (`stack count` per line), loadable by flamegraph.pl, speedscope or inferno.
+    The file is written by the sampler thread on stop, never by the sampled loop.
+    """
+    def __init__(self, thread_id, interval_ms=PROFILE_INTERVAL_MS, log=print):
+        self.thread_id = thread_id
+        self.interval_s = interval_ms / 1000
+        self.log = log
+        self.path = None
+        self.counts = collections.Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stop_event.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[fold_stack(frame)] += 1
+                self.samples += 1
+        try:
+            with open(self.path, "w") as f:
+                for stack, count in self.counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            self.log(f"[LOOP] Profile written to {self.path} ({self.samples} samples)")
+        except OSError as e:
+            self.log(f"[LOOP] Profile write failed: {e}")
+
+    def stop(self, path=None):
+        """Signals the sampler thread to finish and write the file; returns its path without waiting."""
+        self.path = path or f"profile-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+        self.stop_event.set()
+        return self.path
@@ -8,13 +8,17 @@ import websockets
 import time
 import re
 import uuid
+import collections
 from dotenv import load_dotenv
 
 from groq import AsyncGroq
 from cartesia import AsyncCartesia
 
-# Load environment variables
-load_dotenv()
+from glossary import load_glossary, clear_glossary_cache, PlaceholderRestorer, PROMPT_SUFFIX
+import session_journal
+from provider_health import ProviderHealth, DEGRADED
+from loop_monitor import LoopMonitor
+from ack_bank import AckBank, EN_TO_ES, ES_TO_EN
 
 # Audio Configuration
 FORMAT = pyaudio.paInt16
@@ -22,48 +26,242 @@ CHANNELS = 1
 RATE = 16000
 CHUNK = 2048
 
-# API Config Check
-DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-CARTESIA_API_KEY = os.getenv("CARTESIA_API_KEY")
-
-# Voice IDs
-# Incoming (EN->ES): Generic Spanish Voice (Sonic Multilingual supports it)
-# Outgoing (ES->EN): Cloned Voice ID (User provided)
-VOICE_ID_OUTGOING = os.getenv("VOICE_ID_OUTGOING", "a0e99841-438c-4a64-b679-ae501e7d6091") # Default to generic if missing
 VOICE_ID_INCOMING = "a0e99841-438c-4a64-b679-ae501e7d6091" # Generic Sonic ID
+TTS_MODEL_ID = "sonic-multilingual"
+TTS_SAMPLE_RATE = 44100
+
+# Seconds to keep the pipeline alive after a replayed audio source runs out
+REPLAY_TAIL_S = 5
+
+# Longest a queued acknowledgement waits for Cartesia to finish earlier turns' audio
+TTS_DONE_TIMEOUT_S = 5
+
+# Cartesia reconnect backoff (seconds)
+RECONNECT_MIN_S = 0.5
+RECONNECT_MAX_S = 10
+
+def load_config(override=False):
+    """
+    Loads environment variables (.env) into the module settings.
+    Called again with override=True by the bridge daemon to hot-reload keys.
+    """
+    global DEEPGRAM_API_KEY, GROQ_API_KEY, CARTESIA_API_KEY, VOICE_ID_OUTGOING
+    global CONTEXT_TOKEN_BUDGET, GLOSSARY_INCOMING, GLOSSARY_OUTGOING, SESSION_RECORD_DIR
+    global GROQ_MODEL, GROQ_FALLBACK_MODEL, GROQ_SLO_MS, GROQ_TIMEOUT_S, CARTESIA_SLO_MS, STALE_TURN_S
+    global ACK_BANK_ENABLED
+    load_dotenv(override=override)
+
+    # API Config Check
+    DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
+    GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+    CARTESIA_API_KEY = os.getenv("CARTESIA_API_KEY")
+
+    # Voice IDs
+    # Incoming (EN->ES): Generic Spanish Voice (Sonic Multilingual supports it)
+    # Outgoing (ES->EN): Cloned Voice ID (User provided)
+    VOICE_ID_OUTGOING = os.getenv("VOICE_ID_OUTGOING", VOICE_ID_INCOMING) # Default to generic if missing
+
+    # Rolling LLM context (approximate tokens, 0 disables)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+
+    # Optional glossaries (JSON: {"source term": "target term"})
+    GLOSSARY_INCOMING = os.getenv("GLOSSARY_INCOMING")
+    GLOSSARY_OUTGOING = os.getenv("GLOSSARY_OUTGOING")
+
+    # Opt-in session journal (see session_journal.py / replay_session.py)
+    SESSION_RECORD_DIR = os.getenv("SESSION_RECORD_DIR")
+
+    # Models and latency SLOs (see provider_health.py)
+    GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+    GROQ_FALLBACK_MODEL = os.getenv("GROQ_FALLBACK_MODEL") # Used while Groq is degraded, if set
+    GROQ_SLO_MS = int(os.getenv("GROQ_SLO_MS", "700"))         # time to first chunk
+    GROQ_TIMEOUT_S = float(os.getenv("GROQ_TIMEOUT_S", "4"))   # first chunk, and any gap between chunks
+    CARTESIA_SLO_MS = int(os.getenv("CARTESIA_SLO_MS", "800")) # first send to first audio
+    STALE_TURN_S = float(os.getenv("STALE_TURN_S", "3"))       # older turns skip TTS while Cartesia is degraded
+
+    # Pre-synthesized short acknowledgements (see ack_bank.py)
+    ACK_BANK_ENABLED = os.getenv("ACK_BANK", "1") != "0"
+    if override:
+        clear_glossary_cache()
+
+# Load environment variables
+load_config()
+
+def pipeline_configs():
+    """Constructor arguments for each named pipeline, read from the current settings."""
+    return {
+        # Pipeline 1: Incoming (Remote EN -> Local ES)
+        # Input: BlackHole 2ch (System Audio)
+        # Output: Headphones/Default
+        "incoming": dict(
+            name="INCOMING (EN->ES)",
+            input_device_name="BlackHole 2ch",
+            output_device_name="Headphones", # Fallbacks to default
+            stt_lang="en-US",
+            llm_prompt="Translate English to Spanish. Output ONLY Spanish.",
+            tts_voice_id=VOICE_ID_INCOMING,
+            glossary_path=GLOSSARY_INCOMING,
+            ack_phrases=EN_TO_ES
+        ),
+        # Pipeline 2: Outgoing (Local ES -> Remote EN)
+        # Input: Microphone
+        # Output: BlackHole 16ch (Virtual Mic for Meet)
+        "outgoing": dict(
+            name="OUTGOING (ES->EN)",
+            input_device_name="Microphone", # Matches built-in mic usually
+            output_device_name="BlackHole 16ch",
+            stt_lang="es",
+            llm_prompt="Translate Spanish to English. Output ONLY English.",
+            tts_voice_id=VOICE_ID_OUTGOING,
+            glossary_path=GLOSSARY_OUTGOING,
+            ack_phrases=ES_TO_EN
+        ),
+    }
+
+class ConversationContext:
+    """
+    Rolling window of recent (source, translation) pairs sent to Groq.
+
+    Messages are laid out as system prompt + old turns + current turn, so everything
+    before the current transcript is a prefix the provider can cache. Old turns are
+    never rewritten; when the budget is exceeded we drop the oldest turns down to half
+    the budget in one go, so the prefix stays stable for several turns between trims.
+    """
+    def __init__(self, system_prompt, token_budget=None):
+        self.system_prompt = system_prompt
+        self.token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+        self.turns = []
+        self.tokens = 0
+
+    @staticmethod
+    def estimate_tokens(text):
+        # ~4 chars per token for EN/ES; good enough for a budget, no tokenizer needed
+        return len(text) // 4 + 1
+
+    def build_messages(self, text, with_history=True):
+        messages = [{"role": "system", "content": self.system_prompt}]
+        for source, translation in (self.turns if with_history else []):
+            messages.append({"role": "user", "content": source})
+            messages.append({"role": "assistant", "content": translation})
+        messages.append({"role": "user", "content": text})
+        return messages
+
+    def add(self, source, translation):
+        if self.token_budget <= 0 or not translation.strip():
+            return
+        cost = self.estimate_tokens(source) + self.estimate_tokens(translation)
+        if cost > self.token_budget:
+            return
+        self.turns.append((source, translation))
+        self.tokens += cost
+        if self.tokens > self.token_budget:
+            target = self.token_budget // 2
+            while self.turns and self.tokens > target:
+                old_source, old_translation = self.turns.pop(0)
+                self.tokens -= self.estimate_tokens(old_source) + self.estimate_tokens(old_translation)
+
+class LatencyStats:
+    """Running time-to-first-token averages, split by whether context was sent."""
+    def __init__(self):
+        self.samples = {"context": [0, 0.0], "no_context": [0, 0.0]}
+
+    def record(self, with_context, ttft_ms):
+        bucket = self.samples["context" if with_context else "no_context"]
+        bucket[0] += 1
+        bucket[1] += ttft_ms
+
+    def average(self, with_context):
+        count, total = self.samples["context" if with_context else "no_context"]
+        return total / count if count else None
+
+async def next_item(iterator, default=None):
+    """anext(iterator, default); the builtin needs Python 3.10 and macOS ships 3.9."""
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return default
+
+async def close_stream(stream):
+    """Closes an abandoned streaming response so its HTTP connection is released."""
+    try:
+        await stream.close()
+    except Exception:
+        pass
 
 class TranslationPipeline:
-    def __init__(self, name, input_device_name, output_device_name, stt_lang, llm_prompt, tts_voice_id):
+    def __init__(self, name, input_device_name, output_device_name, stt_lang, llm_prompt, tts_voice_id, glossary_path=None,
+                 pyaudio_instance=None, groq_client=None, cartesia_client=None, record_path=None, audio_source=None,
+                 ack_phrases=None):
+        # Shared PyAudio/clients are passed in by the bridge daemon to stay warm across restarts
+        # audio_source (async iterator of PCM chunks) replaces the input device, e.g. for replay
+        self.start_time = time.perf_counter()
+        self.ready_time = None
+        self.first_translation_time = None
         self.name = name
         self.input_device_name = input_device_name
         self.output_device_name = output_device_name
         self.stt_lang = stt_lang
         self.llm_prompt = llm_prompt
         self.tts_voice_id = tts_voice_id
+        self.audio_source = audio_source
+        self.record_path = record_path
+        if not record_path and SESSION_RECORD_DIR:
+            slug = re.sub(r"\W+", "_", name).strip("_").lower()
+            self.record_path = os.path.join(SESSION_RECORD_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{slug}.ttj")
+        self.recorder = None
+        self.ack_bank = AckBank(ack_phrases, tts_voice_id) if ack_phrases and ACK_BANK_ENABLED else None
+        self.turn_heard = {}         # turn id -> time heard, until its first TTS audio
+        self.turn_latency_ms = None  # EMA of heard -> first audio for translated turns
+        self.glossary = load_glossary(glossary_path)
+        if self.glossary:
+            self.llm_prompt += PROMPT_SUFFIX
+        self.context = ConversationContext(self.llm_prompt)
+        self.ttft_stats = LatencyStats()
         
-        self.p = pyaudio.PyAudio()
+        self.owns_pyaudio = pyaudio_instance is None
+        self.p = pyaudio_instance or pyaudio.PyAudio()
         self.input_stream = None
         self.output_stream = None
         
-        self.groq_client = AsyncGroq(api_key=GROQ_API_KEY)
-        self.cartesia_client = AsyncCartesia(api_key=CARTESIA_API_KEY)
+        self.groq_client = groq_client or AsyncGroq(api_key=GROQ_API_KEY)
+        self.cartesia_client = cartesia_client or AsyncCartesia(api_key=CARTESIA_API_KEY)
         
         self.is_running = False
         self.input_device_index = self.get_device_index(self.input_device_name, is_input=True)
         self.output_device_index = self.get_device_index(self.output_device_name, is_input=False)
         
         # Queues
-        self.transcript_queue = asyncio.Queue()
+        self.transcript_queue = asyncio.Queue()  # (text, time heard, ack hit or None)
+        self.translating = False  # a turn is between dequeue and its last TTS send, or an ack is waiting
         self.audio_queue = asyncio.Queue()
+
+        # Provider health and degradation
+        self.groq_health = ProviderHealth("groq", GROQ_SLO_MS, on_transition=self.on_health_transition)
+        self.cartesia_health = ProviderHealth("cartesia", CARTESIA_SLO_MS, on_transition=self.on_health_transition)
+        self.metrics = collections.Counter()
+        self.tts_ws = None
+        self.tts_pending = {}  # turn id -> time of first TTS send
+        self.tts_streaming = {}  # turn id -> time of first TTS send, until Cartesia's "done"
+        self.tts_idle = asyncio.Event()
+        self.tts_idle.set()
         
         self.log(f"Initialized Pipeline '{self.name}'")
         self.log(f"  Input: {self.input_device_name} (Index: {self.input_device_index})")
         self.log(f"  Output: {self.output_device_name} (Index: {self.output_device_index})")
+        if self.glossary:
+            self.log(f"  Glossary: {glossary_path} ({len(self.glossary)} terms)")
 
     def log(self, message):
         print(f"[{time.strftime('%H:%M:%S')}][{self.name}] {message}")
 
+    def record(self, kind, payload):
+        if self.recorder:
+            self.recorder.record(kind, payload)
+
+    def record_stage(self, stage, turn=None):
+        if self.recorder:
+            self.recorder.stage(stage, turn)
+
     def get_device_index(self, name_fragment, is_input=True):
         if not name_fragment: 
             return None
@@ -89,23 +287,50 @@ class TranslationPipeline:
                 return None
         return None
 
-    async def start(self):
-        if self.input_device_index is None:
-            self.log(f"Error: Input device '{self.input_device_name}' not found.")
-            return
-
-        self.is_running = True
-
-        # Initialize Output Stream
+    def open_output_stream(self):
         if self.output_device_index is not None:
             self.output_stream = self.p.open(
                 format=FORMAT,
                 channels=CHANNELS,
-                rate=44100,
+                rate=TTS_SAMPLE_RATE,
                 output=True,
                 output_device_index=self.output_device_index
             )
 
+    def start_recorder(self):
+        if self.record_path:
+            os.makedirs(os.path.dirname(self.record_path) or ".", exist_ok=True)
+            self.recorder = session_journal.SessionRecorder(self.record_path)
+            self.log(f"Recording session to {self.record_path}")
+
+    def start_ack_bank(self):
+        if self.ack_bank:
+            return asyncio.create_task(self.prepare_ack_bank())
+        return None
+
+    async def prepare_ack_bank(self):
+        try:
+            path = await self.ack_bank.prepare(self.cartesia_client, self.cartesia_payload, TTS_MODEL_ID, TTS_SAMPLE_RATE)
+            self.log(f"Ack bank ready: {len(self.ack_bank.audio)} phrases ({path})")
+        except Exception as e:
+            self.log(f"Ack bank unavailable: {e}")
+
+    async def read_audio(self):
+        if self.audio_source is not None:
+            return await next_item(self.audio_source)
+        return await asyncio.to_thread(self.input_stream.read, CHUNK, exception_on_overflow=False)
+
+    async def start(self):
+        if self.input_device_index is None and self.audio_source is None:
+            self.log(f"Error: Input device '{self.input_device_name}' not found.")
+            return
+
+        self.is_running = True
+        self.start_recorder()
+
+        # Initialize Output Stream
+        self.open_output_stream()
+
         # Deepgram Configuration
         host = "wss://api.deepgram.com"
         path = "/v1/listen"
@@ -129,30 +354,41 @@ class TranslationPipeline:
                 self.log("Deepgram Connected!")
 
                 # Open Input Stream
-                self.input_stream = self.p.open(
-                    format=FORMAT,
-                    channels=CHANNELS,
-                    rate=RATE,
-                    input=True,
-                    input_device_index=self.input_device_index,
-                    frames_per_buffer=CHUNK
-                )
-                self.log("Listening...")
+                if self.audio_source is None:
+                    self.input_stream = self.p.open(
+                        format=FORMAT,
+                        channels=CHANNELS,
+                        rate=RATE,
+                        input=True,
+                        input_device_index=self.input_device_index,
+                        frames_per_buffer=CHUNK
+                    )
+                self.ready_time = time.perf_counter()
+                self.log(f"Listening... (ready in {self.ready_time - self.start_time:.2f}s)")
 
                 # Start tasks
+                ack_task = self.start_ack_bank()
                 receive_task = asyncio.create_task(self.receive_loop(ws))
                 process_task = asyncio.create_task(self.processing_loop())
                 playback_task = asyncio.create_task(self.playback_loop())
 
                 try:
                     while self.is_running:
-                        data = await asyncio.to_thread(self.input_stream.read, CHUNK, exception_on_overflow=False)
+                        data = await self.read_audio()
+                        if data is None:
+                            # Replay source exhausted: flush Deepgram and let the tail play out
+                            await ws.send(json.dumps({"type": "Finalize"}))
+                            await asyncio.sleep(REPLAY_TAIL_S)
+                            break
                         if len(data) > 0:
+                            self.record(session_journal.PCM_IN, data)
                             await ws.send(data)
                         else:
                              await asyncio.sleep(0.01)
                 finally:
                     self.log("Stopping loop...")
+                    if ack_task:
+                        ack_task.cancel()
                     receive_task.cancel()
                     process_task.cancel()
                     playback_task.cancel()
@@ -180,7 +416,13 @@ class TranslationPipeline:
                 self.output_stream.stop_stream()
                 self.output_stream.close()
             except: pass
-        self.p.terminate()
+        self.input_stream = None
+        self.output_stream = None
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+        if self.owns_pyaudio:
+            self.p.terminate()
 
     async def receive_loop(self, ws):
         try:
@@ -193,87 +435,270 @@ class TranslationPipeline:
                             transcript = alternatives[0].get("transcript", "")
                             is_final = data.get("is_final", False)
                             if transcript and is_final:
-                                self.log(f"STT: {transcript}")
-                                await self.transcript_queue.put(transcript)
+                                await self.handle_final(transcript)
                 except json.JSONDecodeError:
                     pass
         except Exception as e:
             self.log(f"Receive Error: {e}")
 
-    async def processing_loop(self):
+    async def handle_final(self, transcript):
+        heard_at = time.perf_counter()
+        self.log(f"STT: {transcript}")
+        self.record(session_journal.TRANSCRIPT, transcript)
+        if self.ack_bank:
+            hit = self.ack_bank.lookup(transcript)
+            # Only jump the queue when nothing earlier is still waiting to be spoken
+            if hit and self.transcript_queue.empty() and not self.translating and not self.tts_streaming:
+                self.play_ack(transcript, *hit, heard_at)
+                return
+            if hit:
+                await self.transcript_queue.put((transcript, heard_at, hit))
+                return
+        await self.transcript_queue.put((transcript, heard_at, None))
+
+    def play_ack(self, transcript, target, audio, heard_at):
+        """Plays a pre-synthesized acknowledgement, bypassing Groq and Cartesia."""
+        self.audio_queue.put_nowait(audio)
+        hit_ms = (time.perf_counter() - heard_at) * 1000
+        self.metrics["ack_hits"] += 1
+        saved = ""
+        if self.turn_latency_ms is not None:
+            self.metrics["ack_saved_ms"] += round(self.turn_latency_ms - hit_ms)
+            saved = f", ~{self.turn_latency_ms - hit_ms:.0f}ms saved"
+        self.log(f"ACK >> {target} ({hit_ms:.1f}ms{saved}, {self.metrics['ack_hits']} hits)")
+        self.record_stage("ack_hit")
+        self.record(session_journal.LLM_OUTPUT, target)
+        self.context.add(transcript, target)
+
+    async def wait_tts_done(self):
+        """Waits until earlier turns' audio is all queued (Cartesia "done"), so an ack can't cut in."""
+        try:
+            await asyncio.wait_for(self.tts_idle.wait(), TTS_DONE_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            self.log(f"No TTS done for {len(self.tts_streaming)} turn(s), playing ack anyway")
+            self.tts_streaming.clear()
+            self.tts_idle.set()
+
+    def end_tts_turn(self, turn_id):
+        self.tts_streaming.pop(turn_id, None)
+        if not self.tts_streaming:
+            self.tts_idle.set()
+
+    def on_health_transition(self, health, previous, state, reason):
+        self.log(f"[HEALTH] {health.name}: {previous} -> {state} ({reason})")
+        self.metrics[f"{health.name}_{state}"] += 1
+        self.record_stage(f"health:{health.name}:{state}")
+
+    def tts_skip_reason(self, heard_at):
+        """Output side of the degradation ladder: None to speak, else why the turn is text-only."""
+        if self.tts_ws is None:
+            return "TTS disconnected"
+        if self.cartesia_health.state == DEGRADED and time.perf_counter() - heard_at > STALE_TURN_S:
+            return "stale turn"
+        return None
+
+    async def tts_connection_loop(self):
+        """Keeps a Cartesia websocket in self.tts_ws, reconnecting with exponential backoff."""
+        backoff = RECONNECT_MIN_S
         while self.is_running:
             try:
                 self.log("Connecting to Cartesia TTS...")
                 async with self.cartesia_client.tts.websocket_connect() as ws:
                     self.log("Cartesia TTS Connected")
-                    
-                    # Receiver Task (Full Duplex)
-                    receiver_task = asyncio.create_task(self.cartesia_receive_loop(ws))
-                    
+                    backoff = RECONNECT_MIN_S
+                    self.tts_ws = ws
                     try:
-                        while self.is_running:
-                            text = await self.transcript_queue.get()
-                            self.log(f"Translating: '{text}'")
-                            
-                            try:
-                                # Groq Translation (Streaming)
-                                stream = await self.groq_client.chat.completions.create(
-                                    messages=[
-                                        {
-                                            "role": "system",
-                                            "content": self.llm_prompt
-                                        },
-                                        {
-                                            "role": "user",
-                                            "content": text,
-                                        }
-                                    ],
-                                    model="llama-3.1-8b-instant",
-                                    temperature=0.3,
-                                    max_tokens=1024,
-                                    stream=True,
-                                )
-                                
-                                buffer = ""
-                                turn_id = str(uuid.uuid4())
-                                
-                                async for chunk in stream:
-                                    content = chunk.choices[0].delta.content
-                                    if content:
-                                        buffer += content
-                                        if re.search(r'[.?!,;:]', buffer):
-                                            await self.send_cartesia_payload(ws, buffer, turn_id, continue_stream=True)
-                                            buffer = ""
-                                
-                                if buffer.strip():
-                                    await self.send_cartesia_payload(ws, buffer, turn_id, continue_stream=False)
-                                else:
-                                    # If buffer empty but stream ended, we might want to signal end?
-                                    # But we can't send empty transcript. 
-                                    pass
-
-                            except Exception as e:
-                                self.log(f"Processing Error: {e}")
-                                if "websocket" in str(type(e)).lower(): raise e
-                            finally:
-                                self.transcript_queue.task_done()
+                        # Receiver (Full Duplex); returns when the socket breaks
+                        await self.cartesia_receive_loop(ws)
                     finally:
-                        receiver_task.cancel()
-                        try: await receiver_task
-                        except: pass
+                        self.tts_ws = None
+                        # No more audio will arrive for turns on this socket
+                        self.tts_streaming.clear()
+                        self.tts_idle.set()
             except Exception as e:
                 self.log(f"Cartesia Reconnect: {e}")
-                await asyncio.sleep(2)
+                self.cartesia_health.record_failure("connect")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, RECONNECT_MAX_S)
+
+    async def processing_loop(self):
+        tts_task = asyncio.create_task(self.tts_connection_loop())
+        try:
+            while self.is_running:
+                text, heard_at, ack = await self.transcript_queue.get()
+                self.translating = True
+                try:
+                    if ack:
+                        await self.wait_tts_done()
+                        self.play_ack(text, *ack, heard_at)
+                    else:
+                        await self.translate_turn(text, heard_at)
+                except Exception as e:
+                    self.log(f"Processing Error: {e}")
+                finally:
+                    self.translating = False
+                    self.transcript_queue.task_done()
+        finally:
+            tts_task.cancel()
+            try: await tts_task
+            except: pass
+
+    async def translate_turn(self, text, heard_at):
+        if not self.groq_health.allow_request():
+            self.metrics["dropped_turns"] += 1
+            self.log(f"Groq circuit open, dropping: '{text}'")
+            return
+        self.log(f"Translating: '{text}'")
+
+        # Pin glossary terms so the LLM can't mistranslate them
+        mapping = {}
+        prompt_text = text
+        if self.glossary:
+            prompt_text, mapping = self.glossary.pin(text)
+            if mapping:
+                self.log(f"Glossary: {prompt_text}")
+        restorer = PlaceholderRestorer(mapping)
+
+        # Degradation ladder: Groq degraded -> no context (+ fallback model if configured),
+        # Cartesia open/degraded -> text-only output for this turn
+        fast = self.groq_health.state == DEGRADED
+        model = GROQ_FALLBACK_MODEL if fast and GROQ_FALLBACK_MODEL else GROQ_MODEL
+        if fast:
+            self.metrics["fast_turns"] += 1
+        skip_reason = self.tts_skip_reason(heard_at)
+
+        # Groq Translation (Streaming)
+        turn_id = str(uuid.uuid4())
+        with_context = bool(self.context.turns) and not fast
+        request_start = time.perf_counter()
+        self.record_stage("groq_request", turn_id)
+        stream = None
+        try:
+            # Bounded wait for the first chunk instead of hanging on a slow provider
+            stream = await asyncio.wait_for(
+                self.groq_client.chat.completions.create(
+                    messages=self.context.build_messages(prompt_text, with_history=not fast),
+                    model=model,
+                    temperature=0.3,
+                    max_tokens=1024,
+                    stream=True,
+                ),
+                timeout=GROQ_TIMEOUT_S,
+            )
+            chunks = stream.__aiter__()
+            remaining = GROQ_TIMEOUT_S - (time.perf_counter() - request_start)
+            chunk = await asyncio.wait_for(next_item(chunks), timeout=max(remaining, 0.05))
+        except Exception as e:
+            self.groq_health.record_failure(type(e).__name__)
+            self.log(f"Groq Error ({type(e).__name__}: {e}), skipping: '{text}'")
+            if stream is not None:
+                await close_stream(stream)
+            return
+        self.groq_health.record_success((time.perf_counter() - request_start) * 1000)
+
+        buffer = ""
+        held = ""  # last complete segment, sent once more text follows so the final send can end the context
+        translation = ""
+        first_token = True
+
+        try:
+            while chunk is not None:
+                content = chunk.choices[0].delta.content
+                if content:
+                    if first_token:
+                        first_token = False
+                        self.record_stage("groq_first_token", turn_id)
+                        self.log_ttft(with_context, (time.perf_counter() - request_start) * 1000)
+                    content = restorer.feed(content)
+                    translation += content
+                    if held and content.strip() and not skip_reason:
+                        skip_reason = await self.send_tts(held, turn_id, heard_at, continue_stream=True)
+                        held = ""
+                    buffer += content
+                    if re.search(r'[.?!,;:]', buffer):
+                        held += buffer
+                        buffer = ""
+                # A stream that stalls mid-response counts against Groq like a slow first chunk
+                chunk = await asyncio.wait_for(next_item(chunks), timeout=GROQ_TIMEOUT_S)
+        except Exception as e:
+            self.groq_health.record_failure(f"stream {type(e).__name__}")
+            self.log(f"Groq Stream Error ({type(e).__name__}: {e}), keeping partial: '{translation}'")
+            await close_stream(stream)
+
+        tail = restorer.flush()
+        translation += tail
+        buffer = held + buffer + tail
+        self.record(session_journal.LLM_OUTPUT, translation)
+        # Can't send an empty transcript, so the held segment carries continue=False and Cartesia's "done"
+        if buffer.strip() and not skip_reason:
+            skip_reason = await self.send_tts(buffer, turn_id, heard_at, continue_stream=False)
+        if skip_reason:
+            self.metrics["text_only_turns"] += 1
+            self.log(f"TEXT >> {translation} ({skip_reason})")
+
+        self.context.add(text, translation)
+
+    async def send_tts(self, text, turn_id, heard_at, continue_stream):
+        """Sends one TTS chunk; returns a skip reason if the socket failed (rest of turn goes text-only)."""
+        ws = self.tts_ws
+        if ws is None:
+            return "TTS disconnected"
+        if turn_id not in self.tts_pending:
+            # Checked here rather than before Groq so a half-open probe is only spent on real text
+            if not self.cartesia_health.allow_request():
+                return "Cartesia circuit open"
+            self.expire_tts_pending()
+            self.tts_pending[turn_id] = time.perf_counter()
+            self.turn_heard[turn_id] = heard_at
+            self.tts_streaming[turn_id] = self.tts_pending[turn_id]
+            self.tts_idle.clear()
+        try:
+            await self.send_cartesia_payload(ws, text, turn_id, continue_stream=continue_stream)
+        except Exception as e:
+            self.log(f"Cartesia Send Error: {e}")
+            self.tts_pending.pop(turn_id, None)
+            self.turn_heard.pop(turn_id, None)
+            self.end_tts_turn(turn_id)
+            self.cartesia_health.record_failure("send")
+            return "TTS send failed"
+        return None
+
+    def expire_tts_pending(self):
+        # Turns that never produced audio count against Cartesia
+        deadline = time.perf_counter() - CARTESIA_SLO_MS * 3 / 1000
+        for turn_id, sent_at in list(self.tts_pending.items()):
+            if sent_at < deadline:
+                del self.tts_pending[turn_id]
+                self.turn_heard.pop(turn_id, None)
+                self.end_tts_turn(turn_id)
+                self.cartesia_health.record_failure("no audio")
+
+    def log_ttft(self, with_context, ttft_ms):
+        self.ttft_stats.record(with_context, ttft_ms)
+        avg_ctx = self.ttft_stats.average(True)
+        avg_none = self.ttft_stats.average(False)
+        fmt = lambda v: f"{v:.0f}ms" if v is not None else "n/a"
+        self.log(
+            f"Groq TTFT: {ttft_ms:.0f}ms ({len(self.context.turns)} ctx turns, ~{self.context.tokens} tok) "
+            f"| avg with ctx: {fmt(avg_ctx)}, without: {fmt(avg_none)}"
+        )
 
     async def send_cartesia_payload(self, ws, text, context_id, continue_stream=True):
+        if self.first_translation_time is None:
+            self.first_translation_time = time.perf_counter()
+            self.log(f"Time to first translation: {self.first_translation_time - self.start_time:.2f}s")
         self.log(f"TTS >> {text} (continue={continue_stream})")
+        self.record_stage("tts_send", context_id)
+        await ws.send(self.cartesia_payload(text, context_id, continue_stream))
+
+    def cartesia_payload(self, text, context_id, continue_stream=True):
         output_format = {
             "container": "raw",
             "encoding": "pcm_s16le",
-            "sample_rate": 44100,
+            "sample_rate": TTS_SAMPLE_RATE,
         }
-        payload = {
-            "model_id": "sonic-multilingual",
+        return {
+            "model_id": TTS_MODEL_ID,
             "transcript": text,
             "voice": {
                 "mode": "id",
@@ -283,17 +708,32 @@ class TranslationPipeline:
             "context_id": context_id,
             "continue": continue_stream
         }
-        await ws.send(payload)
 
     async def cartesia_receive_loop(self, ws):
         try:
             async for chunk in ws:
                 audio = getattr(chunk, "audio", None)
                 if audio:
+                    context_id = getattr(chunk, "context_id", None)
+                    if context_id is None and self.tts_pending:
+                        context_id = next(iter(self.tts_pending))
+                    sent_at = self.tts_pending.pop(context_id, None)
+                    if sent_at is not None:
+                        self.cartesia_health.record_success((time.perf_counter() - sent_at) * 1000)
+                    heard_at = self.turn_heard.pop(context_id, None)
+                    if heard_at is not None:
+                        latency_ms = (time.perf_counter() - heard_at) * 1000
+                        self.turn_latency_ms = latency_ms if self.turn_latency_ms is None else 0.8 * self.turn_latency_ms + 0.2 * latency_ms
                     # self.log(f"Received Audio Chunk: {len(audio)} bytes")
+                    self.record(session_journal.TTS_AUDIO, audio)
                     await self.audio_queue.put(audio)
+                if getattr(chunk, "done", False) or getattr(chunk, "type", None) == "done":
+                    # The turn's last audio is queued; acks held behind it may play now
+                    context_id = getattr(chunk, "context_id", None)
+                    self.end_tts_turn(context_id if context_id is not None else next(iter(self.tts_streaming), None))
         except Exception as e:
             self.log(f"Cartesia Receiver Error: {e}")
+            self.cartesia_health.record_failure("socket")
 
     async def playback_loop(self):
         while True:
@@ -309,32 +749,13 @@ class TranslationPipeline:
 
 class BiDirectionalBridge:
     def __init__(self):
-        # Pipeline 1: Incoming (Remote EN -> Local ES)
-        # Input: BlackHole 2ch (System Audio)
-        # Output: Headphones/Default
-        self.incoming = TranslationPipeline(
-            name="INCOMING (EN->ES)",
-            input_device_name="BlackHole 2ch",
-            output_device_name="Headphones", # Fallbacks to default
-            stt_lang="en-US",
-            llm_prompt="Translate English to Spanish. Output ONLY Spanish.",
-            tts_voice_id=VOICE_ID_INCOMING
-        )
-
-        # Pipeline 2: Outgoing (Local ES -> Remote EN)
-        # Input: Microphone
-        # Output: BlackHole 16ch (Virtual Mic for Meet)
-        self.outgoing = TranslationPipeline(
-            name="OUTGOING (ES->EN)",
-            input_device_name="Microphone", # Matches built-in mic usually
-            output_device_name="BlackHole 16ch",
-            stt_lang="es",
-            llm_prompt="Translate Spanish to English. Output ONLY English.",
-            tts_voice_id=VOICE_ID_OUTGOING
-        )
+        configs = pipeline_configs()
+        self.incoming = TranslationPipeline(**configs["incoming"])
+        self.outgoing = TranslationPipeline(**configs["outgoing"])
 
     async def start(self):
         print("Starting Bi-Directional Translation Bridge...")
+        LoopMonitor("bridge").start()
         
         # Run both pipelines concurrently
         await asyncio.gather(
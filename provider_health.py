@@ -0,0 +1,116 @@
+import collections
+import time
+
+# Breaker states, in order of severity
+HEALTHY = "healthy"
+DEGRADED = "degraded"     # SLO violated: pipeline switches to its cheaper path
+OPEN = "open"             # failing: provider is skipped until the cooldown ends
+HALF_OPEN = "half_open"   # cooldown over: one probe request decides open vs recovered
+
+class ProviderHealth:
+    """
+    Rolling latency/error tracker with a circuit breaker for one provider.
+
+    DEGRADED is entered when p90 latency exceeds the SLO or the error rate is too high,
+    and left once p90 is back under RECOVER_RATIO * SLO (hysteresis, so the lighter
+    degraded path doesn't immediately flip the state back). Consecutive failures open
+    the breaker and reset the window; after cooldown_s a single probe is let through.
+    """
+    RECOVER_RATIO = 0.8
+    MIN_SAMPLES = 5
+
+    def __init__(self, name, slo_ms, window=20, max_error_rate=0.3, failure_threshold=3, cooldown_s=15, on_transition=None):
+        self.name = name
+        self.slo_ms = slo_ms
+        self.max_error_rate = max_error_rate
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.on_transition = on_transition
+        self.samples = collections.deque(maxlen=window)  # (latency_ms or None, ok)
+        self.state = HEALTHY
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_started = None
+        self.transitions = collections.Counter()
+
+    def allow_request(self):
+        """False while the breaker is open; lets exactly one probe through after the cooldown."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown_s:
+                return False
+            self._set_state(HALF_OPEN, "cooldown elapsed")
+        if self.state == HALF_OPEN:
+            # A probe that never reported back (e.g. request abandoned) expires after a cooldown
+            now = time.monotonic()
+            if self.probe_started is not None and now - self.probe_started < self.cooldown_s:
+                return False
+            self.probe_started = now
+        return True
+
+    def record_success(self, latency_ms):
+        if self.state == OPEN:
+            return  # late result of a request sent before the outage; only the probe can close it
+        # Far beyond the SLO counts as a failure, not just a slow sample
+        if latency_ms > self.slo_ms * 3:
+            self.record_failure(f"{latency_ms:.0f}ms")
+            return
+        self.samples.append((latency_ms, True))
+        self.consecutive_failures = 0
+        self.probe_started = None
+        if self.state == HALF_OPEN:
+            self._set_state(HEALTHY, f"probe ok in {latency_ms:.0f}ms")
+            return
+        self._evaluate()
+
+    def record_failure(self, reason=""):
+        if self.state == OPEN:
+            return  # already open; late failures don't extend the cooldown
+        self.samples.append((None, False))
+        self.consecutive_failures += 1
+        self.probe_started = None
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            # The window describes the outage now; judge recovery on post-probe samples only
+            self.samples.clear()
+            self._set_state(OPEN, f"{self.consecutive_failures} consecutive failures {reason}".strip())
+        else:
+            self._evaluate()
+
+    def p90_ms(self):
+        latencies = sorted(l for l, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+
+    def error_rate(self):
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def _evaluate(self):
+        p90 = self.p90_ms()
+        errors = self.error_rate()
+        enough = len(self.samples) >= self.MIN_SAMPLES
+        slow = enough and p90 is not None and p90 > self.slo_ms
+        failing = enough and errors > self.max_error_rate
+        if slow or failing:
+            self._set_state(DEGRADED, f"p90 {p90 or 0:.0f}ms / SLO {self.slo_ms}ms, errors {errors:.0%}")
+        elif (p90 or 0) < self.slo_ms * self.RECOVER_RATIO:
+            self._set_state(HEALTHY, f"p90 {p90 or 0:.0f}ms, errors {errors:.0%}")
+
+    def _set_state(self, state, reason):
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        self.transitions[f"{previous}->{state}"] += 1
+        if self.on_transition:
+            self.on_transition(self, previous, state, reason)
+
+    def snapshot(self):
+        p90 = self.p90_ms()
+        return {
+            "state": self.state,
+            "p90_ms": round(p90) if p90 is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+            "transitions": dict(self.transitions),
+        }
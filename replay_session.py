@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import json
+import time
+
+import session_journal
+from session_journal import SessionReader
+
+# Replays a recorded session journal (SESSION_RECORD_DIR) back through a TranslationPipeline.
+#   --from audio        feed the captured PCM through Deepgram -> Groq -> Cartesia
+#   --from transcripts  inject the recorded Deepgram finals straight into Groq -> Cartesia
+#   --timing recorded   keep the original pacing; --timing asap sends as fast as possible
+
+def stage_latencies(reader):
+    """Per-turn Groq time-to-first-token (ms) from a journal's stage records."""
+    requests = {}
+    latencies = []
+    for _, ts, payload in reader.records({session_journal.STAGE}):
+        event = json.loads(bytes(payload))
+        if event["stage"] == "groq_request":
+            requests[event["turn"]] = ts
+        elif event["stage"] == "groq_first_token" and event["turn"] in requests:
+            latencies.append((ts - requests.pop(event["turn"])) * 1000)
+    return latencies
+
+def summarize(label, latencies):
+    if latencies:
+        print(f"{label}: {len(latencies)} turns, Groq TTFT avg {sum(latencies) / len(latencies):.0f}ms, max {max(latencies):.0f}ms")
+    else:
+        print(f"{label}: no Groq turns")
+
+async def paced(reader, kinds, timing, start_ts):
+    """Yields payload copies, sleeping to reproduce the recorded gaps when timing == 'recorded'."""
+    wall_start = time.perf_counter()
+    for _, ts, payload in reader.records(kinds, start_ts):
+        # Copy and drop the view so the mapping can be closed if replay stops early
+        data = bytes(payload)
+        del payload
+        if timing == "recorded":
+            delay = (ts - start_ts) - (time.perf_counter() - wall_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield data
+
+async def replay_transcripts(pipeline, reader, timing, start_ts):
+    from modular_bridge import REPLAY_TAIL_S
+
+    pipeline.is_running = True
+    pipeline.start_recorder()
+    pipeline.open_output_stream()
+    tasks = [asyncio.create_task(pipeline.processing_loop()), asyncio.create_task(pipeline.playback_loop())]
+    ack_task = pipeline.start_ack_bank()
+    if ack_task:
+        tasks.append(ack_task)
+    try:
+        async for text in paced(reader, {session_journal.TRANSCRIPT}, timing, start_ts):
+            await pipeline.handle_final(text.decode("utf-8"))
+        await pipeline.transcript_queue.join()
+        await asyncio.sleep(REPLAY_TAIL_S)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        pipeline.stop()
+
+async def main(args):
+    import modular_bridge
+
+    reader = SessionReader(args.session)
+    print(f"Session {args.session}: started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(reader.wall_start))}, {reader.duration():.1f}s")
+    summarize("Recorded", stage_latencies(reader))
+
+    config = modular_bridge.pipeline_configs()[args.pipeline]
+    if args.mute:
+        config["output_device_name"] = None  # no output device -> no playback
+    audio_source = None
+    if args.source == "audio":
+        audio_source = paced(reader, {session_journal.PCM_IN}, args.timing, args.start)
+    pipeline = modular_bridge.TranslationPipeline(**config, record_path=args.record, audio_source=audio_source)
+
+    if args.source == "audio":
+        await pipeline.start()
+    else:
+        await replay_transcripts(pipeline, reader, args.timing, args.start)
+    if audio_source is not None:
+        await audio_source.aclose()
+    reader.close()
+
+    if args.record:
+        replayed = SessionReader(args.record)
+        summarize("Replayed", stage_latencies(replayed))
+        replayed.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded translation session.")
+    parser.add_argument("session", help="Path to a .ttj session journal")
+    parser.add_argument("--pipeline", choices=["incoming", "outgoing"], default="incoming")
+    parser.add_argument("--from", dest="source", choices=["audio", "transcripts"], default="audio")
+    parser.add_argument("--timing", choices=["recorded", "asap"], default="recorded")
+    parser.add_argument("--start", type=float, default=0.0, help="Seconds into the session to start from")
+    parser.add_argument("--record", help="Journal the replay itself to this path for comparison")
+    parser.add_argument("--mute", action="store_true", help="Don't play translated audio")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        print("\nStopping...")
@@ -0,0 +1,159 @@
+import bisect
+import json
+import mmap
+import struct
+import threading
+import time
+
+# Record kinds
+PCM_IN = 1       # captured microphone/system PCM (16 kHz s16le)
+TRANSCRIPT = 2   # Deepgram final transcript (utf-8)
+LLM_OUTPUT = 3   # full Groq translation for a turn (utf-8)
+TTS_AUDIO = 4    # Cartesia PCM (44.1 kHz s16le)
+STAGE = 5        # stage timestamp, JSON {"stage": ..., "turn": ...}
+
+KIND_NAMES = {PCM_IN: "pcm_in", TRANSCRIPT: "transcript", LLM_OUTPUT: "llm_output", TTS_AUDIO: "tts_audio", STAGE: "stage"}
+
+# Layout: file header, then chunks of records, then (on clean close) an index + trailer.
+# A journal without a trailer (crash) is still readable by scanning the chunks.
+FILE_MAGIC = b"TTRJ"
+FILE_HEADER = struct.Struct("<4sId")        # magic, version, wall-clock start (epoch s)
+CHUNK_HEADER = struct.Struct("<4sIIdd")     # magic, payload bytes, record count, first ts, last ts
+CHUNK_MAGIC = b"CHNK"
+RECORD_HEADER = struct.Struct("<BdI")       # kind, ts (s since start), payload bytes
+INDEX_MAGIC = b"INDX"
+INDEX_ENTRY = struct.Struct("<QddI")        # chunk offset, first ts, last ts, record count
+TRAILER = struct.Struct("<Q4s")             # index offset, magic
+TRAILER_MAGIC = b"TTRE"
+VERSION = 1
+
+class SessionRecorder:
+    """
+    Append-only session journal writer.
+
+    record() only appends to an in-memory batch (safe to call from the event loop);
+    a background thread writes the batch as one chunk every flush_interval seconds.
+    """
+    def __init__(self, path, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.start = time.perf_counter()
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(FILE_MAGIC, VERSION, time.time()))
+
+        self.lock = threading.Lock()
+        self.pending = bytearray()
+        self.pending_count = 0
+        self.first_ts = 0.0
+        self.last_ts = 0.0
+        self.index = []
+
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._writer, name="session-journal", daemon=True)
+        self.thread.start()
+
+    def now(self):
+        return time.perf_counter() - self.start
+
+    def record(self, kind, payload, ts=None):
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        if ts is None:
+            ts = self.now()
+        with self.lock:
+            if not self.pending_count:
+                self.first_ts = ts
+            self.last_ts = ts
+            self.pending_count += 1
+            self.pending += RECORD_HEADER.pack(kind, ts, len(payload))
+            self.pending += payload
+
+    def stage(self, stage, turn=None):
+        self.record(STAGE, json.dumps({"stage": stage, "turn": turn}))
+
+    def _flush(self):
+        with self.lock:
+            if not self.pending_count:
+                return
+            data, count, first_ts, last_ts = self.pending, self.pending_count, self.first_ts, self.last_ts
+            self.pending = bytearray()
+            self.pending_count = 0
+        offset = self.file.tell()
+        self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(data), count, first_ts, last_ts))
+        self.file.write(data)
+        self.file.flush()
+        self.index.append((offset, first_ts, last_ts, count))
+
+    def _writer(self):
+        while not self.closed.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+        index_offset = self.file.tell()
+        self.file.write(INDEX_MAGIC + struct.pack("<I", len(self.index)))
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(TRAILER.pack(index_offset, TRAILER_MAGIC))
+        self.file.close()
+
+    def close(self):
+        if not self.closed.is_set():
+            self.closed.set()
+            self.thread.join()
+
+class SessionReader:
+    """
+    Memory-mapped reader for a session journal.
+
+    Payloads are yielded as memoryviews into the mapping (no copies); copy them with
+    bytes() if they need to outlive the reader.
+    """
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.wall_start = FILE_HEADER.unpack_from(self.map, 0)
+        if magic != FILE_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a session journal")
+        self.index = self._read_index() or self._scan_chunks()
+        self.chunk_starts = [entry[1] for entry in self.index]
+
+    def _read_index(self):
+        if len(self.map) < FILE_HEADER.size + TRAILER.size:
+            return None
+        index_offset, magic = TRAILER.unpack_from(self.map, len(self.map) - TRAILER.size)
+        if magic != TRAILER_MAGIC or self.map[index_offset:index_offset + 4] != INDEX_MAGIC:
+            return None
+        (count,) = struct.unpack_from("<I", self.map, index_offset + 4)
+        base = index_offset + 8
+        return [INDEX_ENTRY.unpack_from(self.map, base + i * INDEX_ENTRY.size) for i in range(count)]
+
+    def _scan_chunks(self):
+        index = []
+        offset = FILE_HEADER.size
+        while offset + CHUNK_HEADER.size <= len(self.map):
+            magic, size, count, first_ts, last_ts = CHUNK_HEADER.unpack_from(self.map, offset)
+            if magic != CHUNK_MAGIC or offset + CHUNK_HEADER.size + size > len(self.map):
+                break  # truncated tail
+            index.append((offset, first_ts, last_ts, count))
+            offset += CHUNK_HEADER.size + size
+        return index
+
+    def duration(self):
+        return self.index[-1][2] if self.index else 0.0
+
+    def records(self, kinds=None, start_ts=0.0):
+        """Yields (kind, ts, payload) in recorded order, optionally filtered by kind/start time."""
+        first = max(0, bisect.bisect_right(self.chunk_starts, start_ts) - 1)
+        for offset, _, last_ts, count in self.index[first:]:
+            if last_ts < start_ts:
+                continue
+            pos = offset + CHUNK_HEADER.size
+            for _ in range(count):
+                kind, ts, size = RECORD_HEADER.unpack_from(self.map, pos)
+                pos += RECORD_HEADER.size
+                if ts >= start_ts and (kinds is None or kind in kinds):
+                    yield kind, ts, memoryview(self.map)[pos:pos + size]
+                pos += size
+
+    def close(self):
+        self.map.close()
+        self.file.close()